@@ -0,0 +1,75 @@
+# cython: language_level=3
+"""
+Cython implementation of the PK-Formula kernel.
+
+Build in place with:
+    python setup.py build_ext --inplace
+
+Author: Serge T. Rwego
+License: MIT
+"""
+
+cimport cython
+from cython.parallel cimport prange
+from libc.math cimport pow
+
+import numpy as np
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _pk_kernel(const double[::1] a, const double[::1] p,
+                     double b, double k, double[::1] out) noexcept nogil:
+    cdef Py_ssize_t i
+    cdef Py_ssize_t n = a.shape[0]
+    
+    # Compute x1
+    out[0] = pow((b - (n-1)*k) / a[0], 1.0/p[0])
+    
+    # Compute remaining variables
+    for i in range(1, n):
+        out[i] = pow(k / a[i], 1.0/p[i])
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _pk_kernel_parallel(const double[::1] a, const double[::1] p,
+                              double b, double k,
+                              double[::1] out) noexcept nogil:
+    cdef Py_ssize_t i
+    cdef Py_ssize_t n = a.shape[0]
+    
+    # Compute x1
+    out[0] = pow((b - (n-1)*k) / a[0], 1.0/p[0])
+    
+    # Compute remaining variables across OpenMP threads
+    for i in prange(1, n, schedule='static'):
+        out[i] = pow(k / a[i], 1.0/p[i])
+
+
+def pk_formula_cython(a, p, double b, double k, bint parallel=False):
+    """
+    Cython version of PK-Formula.
+    
+    Parameters and returns are identical to pk_formula_vectorized().
+    With parallel=True the loop is split across OpenMP threads, which
+    only pays off for large n.
+    """
+    cdef double[::1] a_view = np.ascontiguousarray(a, dtype=np.float64)
+    cdef double[::1] p_view = np.ascontiguousarray(p, dtype=np.float64)
+    
+    # Bounds checks are off in the kernels, so validate sizes here
+    if a_view.shape[0] != p_view.shape[0]:
+        raise ValueError("a and p must be 1-D arrays of the same length")
+    if a_view.shape[0] == 0:
+        raise ValueError("a and p must not be empty")
+    
+    x = np.empty(a_view.shape[0])
+    cdef double[::1] x_view = x
+    
+    if parallel:
+        _pk_kernel_parallel(a_view, p_view, b, k, x_view)
+    else:
+        _pk_kernel(a_view, p_view, b, k, x_view)
+    
+    return x
@@ -78,22 +78,32 @@ def main():
     theta_cd = np.ones(n) * np.sqrt(lambda_reg / n)  # Initial guess
     max_iter = 100
     tol = 1e-10
+    tol2 = tol * tol  # compare squared step length, no sqrt needed
+    
+    # Preallocated buffers reused across sweeps
+    theta_old = np.empty_like(theta_cd)
+    step = np.empty_like(theta_cd)
     
     start_time = time.time()
     for iteration in range(max_iter):
-        theta_old = theta_cd.copy()
+        np.copyto(theta_old, theta_cd)
+        
+        # Current constraint value, updated incrementally below
+        current_sum = np.sum(w_values * theta_cd**p_values)
         
         # Update each coordinate
         for i in range(n):
-            # Current constraint value
-            current_sum = np.sum(w_values * np.power(theta_cd, p_values))
+            old_term = w_values[i] * theta_cd[i]**p_values[i]
             
             # Adjust theta[i] to satisfy constraint
-            remaining = lambda_reg - (current_sum - w_values[i] * theta_cd[i]**p_values[i])
-            theta_cd[i] = np.power(remaining / w_values[i], 1.0 / p_values[i])
+            remaining = lambda_reg - (current_sum - old_term)
+            new_val = (remaining / w_values[i]) ** (1.0 / p_values[i])
+            current_sum += w_values[i] * new_val**p_values[i] - old_term
+            theta_cd[i] = new_val
         
         # Check convergence
-        if np.linalg.norm(theta_cd - theta_old) < tol:
+        np.subtract(theta_cd, theta_old, out=step)
+        if np.dot(step, step) < tol2:
             break
     
     cd_time = time.time() - start_time
@@ -13,10 +13,152 @@ Author: Serge T. Rwego
 License: MIT
 """
 
+from math import pow as _pow
+
 import numpy as np
 
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Fallback when Numba is unavailable: run the kernel as plain Python."""
+        def decorator(func):
+            return func
+        return decorator
+
+# Problem size from which the compiled kernels split the root loop across
+# threads; below it, thread start-up costs more than the loop itself
+PARALLEL_THRESHOLD = 10000
+
+
+def _constraint_value(x, a, p):
+    """
+    Evaluate sum(a_i * x_i^p_i), fusing the reduction for uniform p.
+
+    p == 2 becomes a single einsum over a, x, x and p == 1 a plain dot
+    product; other uniform exponents pass a Python scalar to ``**`` so
+    NumPy can pick its dedicated square/sqrt ufuncs. The fused paths need
+    1-D arrays of one shape; anything else is broadcast by np.sum.
+    """
+    if (x.ndim == 1 and x.size and a.shape == x.shape == p.shape
+            and np.all(p == p.flat[0])):
+        p0 = float(p.flat[0])
+        if p0 == 2.0:
+            return np.einsum('i,i,i->', a, x, x)
+        if p0 == 1.0:
+            return np.dot(a, x)
+        return np.dot(a, x ** p0)
+    return np.sum(a * x ** p)
+
+
+def _as_float_arrays(a, p, dtype=None):
+    """
+    Convert a and p to arrays of a common floating dtype.
+
+    When dtype is None, a's dtype is kept if it is floating (so float32
+    inputs stay float32); otherwise float64 is used.
+    """
+    a = np.asarray(a)
+    if dtype is None:
+        dtype = a.dtype if np.issubdtype(a.dtype, np.floating) else np.float64
+    return a.astype(dtype, copy=False), np.asarray(p, dtype=dtype)
+
+
+def _output_buffer(out, n, dtype, a, p):
+    """
+    Return the solution buffer, checking a caller-supplied out's shape and
+    that the result can be stored in its dtype without a cross-kind cast.
+
+    If out overlaps a or p, those are copied first so that writing the
+    solution cannot change inputs that are still to be read.
+    """
+    if out is None:
+        return np.empty(n, dtype=dtype), a, p
+    if out.shape != (n,):
+        raise ValueError(f"out must have shape ({n},), got {out.shape}")
+    if not np.can_cast(dtype, out.dtype, casting='same_kind'):
+        raise ValueError(f"out has dtype {out.dtype}, which cannot hold "
+                         f"{np.dtype(dtype)} results")
+    if np.may_share_memory(out, a):
+        a = a.copy()
+    if np.may_share_memory(out, p):
+        p = p.copy()
+    return out, a, p
+
+
+def _check_nonempty(n):
+    """Raise ValueError for an empty problem, as the C library does for n <= 0."""
+    if n == 0:
+        raise ValueError("a and p must not be empty")
 
-def pk_formula(a, p, b, k):
+
+_NO_REAL_ROOT = ("No real solution for this k: a negative base would "
+                 "need a fractional root")
+
+
+def _check_real_roots(bases, p):
+    """
+    Raise ValueError if any base**(1/p) has no real value.
+
+    A negative base only has a real root when 1/p is an integer. Checking
+    up front avoids pow's slow NaN path and reports the bad choice of k.
+    """
+    negative = bases < 0
+    if np.any(negative):
+        fractional = np.mod(np.reciprocal(p), 1.0) != 0
+        if np.any(negative & fractional):
+            raise ValueError(_NO_REAL_ROOT)
+
+
+def _scalar_root(base, inv_p):
+    """
+    base**inv_p for scalars via math.pow, avoiding ufunc overhead.
+
+    math.pow raises where NumPy returns inf or nan (overflow, zero base
+    with a negative exponent); those cases fall back to NumPy so that
+    pk_formula() matches pk_formula_vectorized(). Like _check_real_roots(),
+    raises ValueError for a negative base with a fractional root.
+    """
+    if base < 0 and inv_p % 1 != 0:
+        raise ValueError(_NO_REAL_ROOT)
+    try:
+        return _pow(base, inv_p)
+    except (OverflowError, ValueError):
+        return np.power(base, inv_p)
+
+
+def _uniform_root_inplace(x, p0):
+    """
+    Replace x with x**(1/p0) in place for a scalar exponent p0.
+
+    Dispatches p0 == 2 to np.sqrt and skips the power entirely for p0 == 1.
+    """
+    if p0 == 2.0:
+        np.sqrt(x, out=x)
+    elif p0 != 1.0:
+        x **= 1.0/p0
+
+
+def _uniform_exponent(p):
+    """Return p's common value as a float, or None if p is not uniform."""
+    p0 = float(p.flat[0])
+    return p0 if np.all(p == p0) else None
+
+
+def _root_inplace(x, p):
+    """Replace x with x**(1/p) in place; p broadcasts against x."""
+    p0 = _uniform_exponent(p)
+    if p0 is not None:
+        _uniform_root_inplace(x, p0)
+    else:
+        x **= np.reciprocal(p)
+
+
+def pk_formula(a, p, b, k, verify=False, dtype=None, out=None):
     """
     Solve separable polynomial constraint using PK-Formula.
     
@@ -32,11 +174,33 @@ def pk_formula(a, p, b, k):
         Constraint value
     k : float
         Parameter value
+    verify : bool, optional
+        If True, recompute the constraint and print a warning when the
+        error exceeds 1e-10 (default: False). Use verify_solution() to
+        obtain the error explicitly.
+    dtype : data-type, optional
+        Floating dtype of the computation and result. Defaults to the dtype
+        of a if it is floating, float64 otherwise. float32 halves memory
+        traffic for large n; keep float64 when errors near 1e-10 matter.
+    out : ndarray, optional
+        Array of shape (n,) to write the solution into, e.g. a buffer
+        reused across a sweep over k. A new array is allocated if None.
+        Its dtype must accept a same-kind cast from the computation dtype
+        (e.g. float32 or float64, not an integer type). out may overlap
+        a or p; they are copied before being overwritten.
+        Its contents are unspecified if ValueError is raised.
     
     Returns
     -------
     x : ndarray
-        Solution vector [x1, x2, ..., xn]
+        Solution vector [x1, x2, ..., xn] (out, if given)
+    
+    Raises
+    ------
+    ValueError
+        If k makes a base negative where its root 1/p_i is fractional,
+        so that no real solution exists
+        or if a is empty
     
     Examples
     --------
@@ -50,54 +214,391 @@ def pk_formula(a, p, b, k):
     [2.54950976 1.22474487 1.22474487]
     
     >>> # Verify solution
-    >>> constraint_value = np.sum(a * np.power(x, p))
-    >>> print(f"Constraint value: {constraint_value:.10f}, Target: {b}")
-    Constraint value: 10.0000000000, Target: 10.0
+    >>> is_valid, error = verify_solution(x, a, p, b)
+    >>> print(f"Valid: {is_valid}, Error: {error:.1e}")
+    Valid: True, Error: 0.0e+00
     """
-    a = np.asarray(a, dtype=float)
-    p = np.asarray(p, dtype=float)
+    a, p = _as_float_arrays(a, p, dtype)
     n = len(a)
+    _check_nonempty(n)
     
-    x = np.zeros(n)
+    x, a, p = _output_buffer(out, n, a.dtype, a, p)
     
     # Compute x1
-    x[0] = np.power((b - (n-1)*k) / a[0], 1.0/p[0])
+    x[0] = _scalar_root((b - (n-1)*k) / a[0], 1.0/p[0])
     
     # Compute remaining variables
     for i in range(1, n):
-        x[i] = np.power(k / a[i], 1.0/p[i])
+        x[i] = _scalar_root(k / a[i], 1.0/p[i])
     
-    # Verification
-    constraint_value = np.sum(a * np.power(x, p))
-    error = np.abs(constraint_value - b)
-    if error > 1e-10:
-        print(f"Warning: Solution error {error:.2e}")
+    # Optional verification
+    if verify:
+        constraint_value = _constraint_value(x, a, p)
+        error = np.abs(constraint_value - b)
+        if error > 1e-10:
+            print(f"Warning: Solution error {error:.2e}")
     
     return x
 
 
-def pk_formula_vectorized(a, p, b, k):
+def pk_formula_vectorized(a, p, b, k, dtype=None, out=None):
     """
     Vectorized version of PK-Formula for improved performance.
     
-    Parameters and returns are identical to pk_formula().
+    Parameters and returns are identical to pk_formula() (without verify).
     This version uses NumPy vectorization for faster computation.
     """
-    a = np.asarray(a, dtype=float)
-    p = np.asarray(p, dtype=float)
+    a, p = _as_float_arrays(a, p, dtype)
     n = len(a)
+    _check_nonempty(n)
     
-    x = np.zeros(n)
+    x, a, p = _output_buffer(out, n, a.dtype, a, p)
     
-    # Compute x1
-    x[0] = np.power((b - (n-1)*k) / a[0], 1.0/p[0])
+    # Bases k/a_i, with x1's base (b - (n-1)k)/a_1 written over slot 0;
+    # the roots are then taken in place to avoid temporaries
+    base0 = (b - (n-1)*k) / a[0]
+    np.divide(k, a, out=x)
+    x[0] = base0
     
-    # Compute remaining variables (vectorized)
-    x[1:] = np.power(k / a[1:], 1.0 / p[1:])
+    _check_real_roots(x, p)
+    _root_inplace(x, p)
     
     return x
 
 
+def pk_formula_batch(a, p, b, k, dtype=None):
+    """
+    Solve many PK-Formula problems in one vectorized call.
+    
+    Useful for sweeps over b or k (e.g. regularization strength), where
+    calling pk_formula_vectorized() in a Python loop would pay NumPy's
+    dispatch overhead once per problem.
+    
+    Parameters
+    ----------
+    a : array_like
+        Coefficient vector of shape (n,), or (M, n) for per-problem values
+    p : array_like
+        Exponent vector of shape (n,), or (M, n) for per-problem values
+    b : float or array_like
+        Constraint value(s), scalar or shape (M,)
+    k : float or array_like
+        Parameter value(s), scalar or shape (M,)
+    dtype : data-type, optional
+        Floating dtype of the computation, as in pk_formula()
+    
+    Returns
+    -------
+    x : ndarray
+        Solutions of shape (M, n); row m solves problem m. A single
+        problem (scalar b and k, 1-D a and p) gives shape (1, n).
+    
+    Examples
+    --------
+    >>> a = np.array([1.0, 1.0, 1.0])
+    >>> p = np.array([2.0, 2.0, 2.0])
+    >>> X = pk_formula_batch(a, p, 10.0, np.array([1.0, 1.5, 2.0]))
+    >>> X.shape
+    (3, 3)
+    """
+    a, p = _as_float_arrays(a, p, dtype)
+    b = np.asarray(b, dtype=a.dtype)
+    k = np.asarray(k, dtype=a.dtype)
+    n = a.shape[-1]
+    _check_nonempty(n)
+    
+    # (1, 1) keeps the result 2-D when b, k, a and p describe one problem
+    shape = np.broadcast_shapes(a.shape, p.shape,
+                                b.shape + (1,), k.shape + (1,), (1, 1))
+    
+    # Same layout as pk_formula_vectorized(), one row per problem
+    x = np.empty(shape, dtype=a.dtype)
+    np.divide(k[..., None], a, out=x)
+    x[..., 0] = (b - (n-1)*k) / a[..., 0]
+    
+    _check_real_roots(x, p)
+    _root_inplace(x, p)
+    
+    return x
+
+
+class PKSolver:
+    """
+    PK-Formula solver with precomputed coefficient data.
+    
+    For repeated solves with the same a and p (e.g. sweeping b or k), the
+    reciprocals 1/a_i and 1/p_i are computed once here, so each solve()
+    needs only multiplications and the root step.
+    
+    Parameters
+    ----------
+    a : array_like
+        Coefficient vector [a1, a2, ..., an]
+    p : array_like
+        Exponent vector [p1, p2, ..., pn]
+    dtype : data-type, optional
+        Floating dtype of the computation, as in pk_formula()
+    
+    Examples
+    --------
+    >>> solver = PKSolver([1.0, 1.0, 1.0], [2.0, 2.0, 2.0])
+    >>> x = np.empty(3)
+    >>> for k in [1.0, 1.5, 2.0]:
+    ...     x = solver.solve(10.0, k, out=x)
+    """
+    
+    def __init__(self, a, p, dtype=None):
+        a, p = _as_float_arrays(a, p, dtype)
+        self.a = a
+        self.p = p
+        self.n = len(a)
+        _check_nonempty(self.n)
+        self.inv_a = np.reciprocal(a)
+        self.inv_p = np.reciprocal(p)
+        self._p0 = _uniform_exponent(p)
+    
+    def solve(self, b, k, out=None):
+        """
+        Solve sum(a_i * x_i^p_i) = b for parameter k.
+        
+        Parameters
+        ----------
+        b : float
+            Constraint value
+        k : float
+            Parameter value
+        out : ndarray, optional
+            Array of shape (n,) to write the solution into; passing the
+            same buffer on every call makes a sweep allocation-free
+        
+        Returns
+        -------
+        x : ndarray
+            Solution vector [x1, x2, ..., xn] (out, if given)
+        """
+        x, inv_a, inv_p = _output_buffer(out, self.n, self.a.dtype,
+                                         self.inv_a, self.inv_p)
+        base0 = (b - (self.n-1)*k) * inv_a[0]
+        np.multiply(k, inv_a, out=x)
+        x[0] = base0
+        
+        _check_real_roots(x, self.p)
+        if self._p0 is not None:
+            _uniform_root_inplace(x, self._p0)
+        else:
+            x **= inv_p
+        
+        return x
+
+
+@njit(cache=True, fastmath=True)
+def _pk_kernel(a, p, b, k):
+    n = a.shape[0]
+    x = np.empty(n)
+    if n == 0:
+        # Numba does not bounds-check, so x[0] must not be written
+        return x
+    x[0] = ((b - (n-1)*k) / a[0]) ** (1.0 / p[0])
+    for i in range(1, n):
+        x[i] = (k / a[i]) ** (1.0 / p[i])
+    return x
+
+
+@njit(parallel=True, cache=True, fastmath=True)
+def _pk_kernel_parallel(a, p, b, k):
+    n = a.shape[0]
+    x = np.empty(n)
+    if n == 0:
+        return x
+    x[0] = ((b - (n-1)*k) / a[0]) ** (1.0 / p[0])
+    for i in prange(1, n):
+        x[i] = (k / a[i]) ** (1.0 / p[i])
+    return x
+
+
+def pk_formula_numba(a, p, b, k):
+    """
+    Numba-compiled version of PK-Formula.
+    
+    Parameters and returns are identical to pk_formula_vectorized().
+    The whole solve runs as a single compiled loop, which removes the
+    per-call NumPy dispatch overhead that dominates for small n. The
+    kernel is cached on disk after the first compilation. Problems with
+    n > PARALLEL_THRESHOLD run the loop across threads with prange. Falls
+    back to an interpreted loop when Numba is not installed.
+    
+    Unlike the NumPy solvers, k is not validated: a negative base with a
+    fractional root gives NaN instead of raising ValueError.
+    """
+    a = np.ascontiguousarray(a, dtype=float)
+    p = np.ascontiguousarray(p, dtype=float)
+    # The compiled kernels do not bounds-check their reads of p
+    if a.ndim != 1 or p.ndim != 1 or a.shape != p.shape:
+        raise ValueError("a and p must be 1-D arrays of the same length")
+    _check_nonempty(len(a))
+    if len(a) > PARALLEL_THRESHOLD:
+        return _pk_kernel_parallel(a, p, float(b), float(k))
+    return _pk_kernel(a, p, float(b), float(k))
+
+
+def pack_pk_params(a, p):
+    """
+    Pack a, p and 1/p into one C-contiguous (3, n) float64 array.
+    
+    The result is the params argument of pk_formula_packed().
+    """
+    a = np.asarray(a, dtype=np.float64)
+    p = np.asarray(p, dtype=np.float64)
+    params = np.empty((3, len(a)))
+    params[0] = a
+    params[1] = p
+    np.reciprocal(p, out=params[2])
+    return params
+
+
+@njit(cache=True, fastmath=True)
+def _pk_packed_kernel(params, b, k):
+    n = params.shape[1]
+    x = np.empty(n)
+    if n == 0:
+        return x
+    x[0] = ((b - (n-1)*k) / params[0, 0]) ** params[2, 0]
+    for i in range(1, n):
+        x[i] = (k / params[0, i]) ** params[2, i]
+    return x
+
+
+def pk_formula_packed(params, b, k):
+    """
+    PK-Formula on coefficients packed by pack_pk_params().
+    
+    Parameters
+    ----------
+    params : ndarray
+        C-contiguous (3, n) float64 array with rows [a, p, 1/p]
+    b : float
+        Constraint value
+    k : float
+        Parameter value
+    
+    Returns
+    -------
+    x : ndarray
+        Solution vector [x1, x2, ..., xn]
+    
+    Notes
+    -----
+    Keeping all per-element data in one buffer with 1/p precomputed lets
+    the compiled loop stream through a single allocation without any
+    divisions by p. Pack once and reuse params across solves.
+    
+    As in pk_formula_numba(), k is not validated: a negative base with a
+    fractional root gives NaN.
+    """
+    params = np.ascontiguousarray(params, dtype=np.float64)
+    # The compiled kernel reads params[2, i] without bounds checks
+    if params.ndim != 2 or params.shape[0] != 3:
+        raise ValueError(f"params must have shape (3, n), got {params.shape}")
+    _check_nonempty(params.shape[1])
+    return _pk_packed_kernel(params, float(b), float(k))
+
+
+def make_pk_solver(a, p):
+    """
+    Build a Numba-compiled solver specialized to fixed a and p.
+    
+    a, 1/p and n are captured as compile-time constants, so LLVM can fold
+    them into the loop instead of reading them from argument arrays. Each
+    call to make_pk_solver() compiles a new function on first use (not
+    cached on disk), and compile time grows with n, so this is meant for
+    small fixed n: build the solver once and reuse it across solves.
+    For large n use pk_formula_numba(). As in
+    pk_formula_numba(), k is not validated: a negative base with a
+    fractional root gives NaN.
+    
+    Parameters
+    ----------
+    a : array_like
+        Coefficient vector [a1, a2, ..., an]
+    p : array_like
+        Exponent vector [p1, p2, ..., pn]
+    
+    Returns
+    -------
+    solve : callable
+        solve(b, k) returning the solution vector as in pk_formula()
+    
+    Examples
+    --------
+    >>> solve = make_pk_solver([1.0, 1.0, 1.0], [2.0, 2.0, 2.0])
+    >>> x = solve(10.0, 1.5)
+    """
+    a = tuple(float(ai) for ai in a)
+    inv_p = tuple(1.0 / float(pi) for pi in p)
+    n = len(a)
+    if n != len(inv_p):
+        raise ValueError("a and p must be 1-D arrays of the same length")
+    _check_nonempty(n)
+    
+    @njit(fastmath=True)
+    def solve(b, k):
+        x = np.empty(n)
+        x[0] = ((b - (n-1)*k) / a[0]) ** inv_p[0]
+        for i in range(1, n):
+            x[i] = (k / a[i]) ** inv_p[i]
+        return x
+    
+    return solve
+
+
+try:
+    from _pk_cython import pk_formula_cython as _pk_formula_cython
+    HAVE_CYTHON = True
+    
+    def pk_formula_cython(a, p, b, k):
+        """
+        Cython version of PK-Formula (see _pk_cython.pyx).
+        
+        Parameters and returns are identical to pk_formula_vectorized().
+        Problems with n > PARALLEL_THRESHOLD run the loop across OpenMP
+        threads. k is not validated: a negative base with a fractional
+        root gives NaN (the unbuilt fallback raises ValueError instead).
+        """
+        return _pk_formula_cython(a, p, b, k,
+                                  parallel=len(a) > PARALLEL_THRESHOLD)
+except ImportError:
+    HAVE_CYTHON = False
+
+    def pk_formula_cython(a, p, b, k):
+        """
+        Cython version of PK-Formula (see _pk_cython.pyx).
+        
+        The compiled extension is not built, so this falls back to
+        pk_formula_vectorized(), which raises ValueError for an invalid k
+        where the compiled kernel returns NaN. Build it from python/ with:
+            python setup.py build_ext --inplace
+        """
+        return pk_formula_vectorized(a, p, b, k)
+
+
+try:
+    from _pk_native import pk_formula_c
+    HAVE_NATIVE = True
+except ImportError:
+    HAVE_NATIVE = False
+
+    def pk_formula_c(a, p, b, k):
+        """
+        Native C version of PK-Formula (see _pk_native.c).
+        
+        The compiled extension is not built, so this falls back to
+        pk_formula_vectorized(), which raises ValueError for an invalid k
+        where the compiled kernel returns NaN. Build it from python/ with:
+            python setup.py build_ext --inplace
+        """
+        return pk_formula_vectorized(a, p, b, k)
+
+
 def verify_solution(x, a, p, b, tol=1e-10):
     """
     Verify that solution x satisfies the constraint.
@@ -126,7 +627,7 @@ def verify_solution(x, a, p, b, tol=1e-10):
     a = np.asarray(a)
     p = np.asarray(p)
     
-    constraint_value = np.sum(a * np.power(x, p))
+    constraint_value = _constraint_value(x, a, p)
     error = np.abs(constraint_value - b)
     
     is_valid = error < tol
@@ -166,3 +667,49 @@ if __name__ == "__main__":
     # Compare with vectorized version
     x_vec = pk_formula_vectorized(a, p, b, k)
     print(f"Vectorized solution matches: {np.allclose(x, x_vec)}")
+    
+    # Compare with Numba version
+    x_nb = pk_formula_numba(a, p, b, k)
+    print(f"Numba solution matches: {np.allclose(x, x_nb)}")
+    
+    # Compare with packed-parameter version
+    x_pk = pk_formula_packed(pack_pk_params(a, p), b, k)
+    print(f"Packed solution matches: {np.allclose(x, x_pk)}")
+    
+    # Compare with specialized Numba solver
+    x_sp = make_pk_solver(a, p)(b, k)
+    print(f"Specialized solution matches: {np.allclose(x, x_sp)}")
+    
+    # Compare with Cython version
+    x_cy = pk_formula_cython(a, p, b, k)
+    print(f"Cython solution matches: {np.allclose(x, x_cy)}")
+    
+    # Compare with native C version
+    x_c = pk_formula_c(a, p, b, k)
+    print(f"Native solution matches: {np.allclose(x, x_c)}")
+    print()
+    
+    # Reuse an output buffer across a sweep over k
+    buf = np.empty(len(a))
+    solver = PKSolver(a, p)
+    sweep_ok = True
+    for k_i in [1.0, 1.5, 2.0]:
+        ref = pk_formula(a, p, b, k_i)
+        sweep_ok &= pk_formula(a, p, b, k_i, out=buf) is buf
+        sweep_ok &= np.allclose(pk_formula_vectorized(a, p, b, k_i, out=buf), ref)
+        sweep_ok &= np.allclose(solver.solve(b, k_i, out=buf), ref)
+    print(f"Buffer reuse (out=) matches: {sweep_ok}")
+    
+    # Batched sweep over k
+    ks = np.array([1.0, 1.5, 2.0])
+    X = pk_formula_batch(a, p, b, ks)
+    batch_ok = X.shape == (len(ks), len(a)) and all(
+        np.allclose(X[m], pk_formula(a, p, b, ks[m])) for m in range(len(ks)))
+    print(f"Batched solutions match: {batch_ok}")
+    
+    # A k with (n-1)k > b leaves no real solution for p = 2
+    try:
+        pk_formula(a, p, b, 6.0)
+        print("Invalid k rejected: False")
+    except ValueError:
+        print("Invalid k rejected: True")
@@ -0,0 +1,46 @@
+"""
+Build script for the optional compiled kernels used by pk_formula_cython()
+and pk_formula_c(). Run from this directory:
+
+    python setup.py build_ext --inplace
+
+_pk_native is plain C and only needs NumPy; _pk_cython is skipped when
+Cython is not installed. pk_formula.py works without either, falling back
+to pk_formula_vectorized().
+"""
+
+import numpy as np
+from setuptools import Extension, setup
+
+extensions = [
+    Extension(
+        "_pk_native",
+        ["_pk_native.c"],
+        include_dirs=[np.get_include()],
+        extra_compile_args=["-O3", "-ffast-math", "-march=native",
+                            "-fopenmp-simd"],
+        libraries=["m"],
+    ),
+]
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    print("Cython not found: skipping _pk_cython")
+else:
+    extensions += cythonize([
+        Extension(
+            "_pk_cython",
+            ["_pk_cython.pyx"],
+            include_dirs=[np.get_include()],
+            extra_compile_args=["-O3", "-ffast-math", "-march=native",
+                                "-fopenmp"],
+            extra_link_args=["-fopenmp"],
+            libraries=["m"],
+        ),
+    ])
+
+setup(
+    name="pk-formula-extensions",
+    ext_modules=extensions,
+)